@@ -38,7 +38,7 @@ NODE_ADDRESSES = []  # Will be populated with other node addresses from env vars
 blockchain = []  # The blockchain
 pending_transactions = []  # Transaction pool
 account_balances = {}  # Account model: public_key -> balance
-contract_state_db = {}     # Contract state: contract_id-key -> value
+contract_state_db = {}     # Contract state: contract_id -> {key: value}
 deployed_contracts = {}    # Deployed contracts: contract_id -> contract_info
 mined_nonces = set()  # Set of nonces that have been used
 mining_thread = None
@@ -158,6 +158,13 @@ def generate_keypair():
     
     return private_key, public_key, public_key_str
 
+# Signature padding and hash shared by sign_message and verify_signature
+_SIG_PAD = padding.PSS(
+    mgf=padding.MGF1(hashes.SHA256()),
+    salt_length=padding.PSS.MAX_LENGTH
+)
+_SIG_ALG = hashes.SHA256()
+
 def sign_message(private_key, message):
     """
     Sign a message with private key
@@ -171,11 +178,8 @@ def sign_message(private_key, message):
     message_bytes = message.encode('utf-8')
     signature = private_key.sign(
         message_bytes,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
+        _SIG_PAD,
+        _SIG_ALG
     )
     return signature
 
@@ -203,11 +207,8 @@ def verify_signature(public_key_str, message, signature):
         found_key.verify(
             signature,
             message_bytes,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
+            _SIG_PAD,
+            _SIG_ALG
         )
         return True
     except InvalidSignature:
@@ -831,7 +832,7 @@ def get_contract_info(contract_id):
     # Don't include the code for security reasons, just basic info
     contract_info = {
         'contract_id': contract_id,
-        'owner': contract['owner'],
+        'owner': contract.owner,
         'deployed_in_block': find_contract_block(contract_id)
     }
     
@@ -988,6 +989,39 @@ def new_transaction():
     
     return jsonify({'message': 'Transaction will be added to the next block'}), 201
 
+@app.route('/transactions/batch', methods=['POST'])
+def new_transactions_batch():
+    """
+    Endpoint for receiving several transactions in one request
+    
+    Input: JSON {"transactions": [...]} in request body
+    Output: JSON response with accepted and rejected counts
+    """
+    data = request.get_json(silent=True)
+    transactions = data.get('transactions') if isinstance(data, dict) else None
+    
+    # Reject malformed bodies before validation touches them
+    if not isinstance(transactions, list) or not all(isinstance(tx, dict) for tx in transactions):
+        logger.warning("❌ Malformed transaction batch received")
+        return jsonify({'message': 'Body must be {"transactions": [transaction, ...]}'}), 400
+    
+    accepted = 0
+    for transaction in transactions:
+        # Validate each transaction exactly as /transactions/new does
+        if validate_transaction(transaction):
+            pending_transactions.append(transaction)
+            accepted += 1
+    
+    rejected = len(transactions) - accepted
+    if rejected:
+        logger.warning(f"❌ {rejected} invalid transactions in batch of {len(transactions)}")
+    if accepted:
+        logger.info(f"💰 Received batch: {accepted} transactions accepted. Pool size: {len(pending_transactions)}")
+        return jsonify({'message': 'Transactions will be added to the next block',
+                        'accepted': accepted, 'rejected': rejected}), 201
+    
+    return jsonify({'message': 'Invalid transactions', 'accepted': 0, 'rejected': rejected}), 400
+
 @app.route('/blocks/new', methods=['POST'])
 def new_block():
     """
@@ -1162,7 +1196,7 @@ def get_contract(contract_id):
     # Don't include the code for security reasons, just basic info
     contract_info = {
         'contract_id': contract_id,
-        'owner': contract['owner'],
+        'owner': contract.owner,
         'deployed_in_block': find_contract_block(contract_id)
     }
     
@@ -8,6 +8,7 @@ import time
 import json
 import random
 import hashlib
+import orjson
 import requests
 import threading
 import logging
@@ -25,39 +26,36 @@ logger = logging.getLogger('miner')
 DIFFICULTY = 4  # Number of leading zeros required in hash
 NODE_API_URL = "http://localhost:5000"  # URL of the main node program
 MINING_INTERVAL = 0.1  # How often to try mining (seconds)
+SEARCH_BATCH_SIZE = 100000  # Nonces tried per search_block() call
+NONCE_MASK = 0xFFFFFFFFFFFFFFFF  # Nonces are 64-bit and wrap around
+_ZERO_PREFIX = '0' * DIFFICULTY  # Required hash prefix, refreshed when DIFFICULTY changes
 
-def calculate_hash(data):
-    """
-    Calculate SHA-256 hash of data
-    
-    Input:
-        data: Data to hash (string)
-    Output:
-        hash_string: Hex digest of the hash
-    """
-    data_bytes = data.encode('utf-8')
-    return hashlib.sha256(data_bytes).hexdigest()
+_sha256 = hashlib.sha256
 
-def is_valid_proof(hash_string):
-    """
-    Check if hash meets difficulty requirement
-    
-    Input:
-        hash_string: Hash to check
-    Output:
-        Boolean: True if hash meets difficulty, False otherwise
-    """
-    return hash_string.startswith('0' * DIFFICULTY)
+# Reuse one connection to the node and pre-encode payloads with orjson
+_SESSION = requests.Session()
+_JSON_HEADERS = {'Content-Type': 'application/json'}
 
-def generate_nonce():
+def search_block(start_nonce, max_tries):
     """
-    Generate a random nonce
+    Search consecutive nonces for one whose hash starts with _ZERO_PREFIX
     
-    Input: None
+    Input:
+        start_nonce: First nonce to try
+        max_tries: Number of nonces to try before giving up
     Output:
-        nonce: Random integer
+        (nonce, hash_string): Winning nonce and its hash, or (None, None)
     """
-    return random.randint(0, 1000000)
+    # Hash, check and increment run in one tight loop with everything bound
+    # to locals, so there is no per-attempt function call overhead
+    prefix = _ZERO_PREFIX
+    sha256 = _sha256
+    stop = min(start_nonce + max_tries, NONCE_MASK + 1)
+    for nonce in range(start_nonce, stop):
+        hash_string = sha256(b'%d' % nonce).hexdigest()
+        if hash_string.startswith(prefix):
+            return nonce, hash_string
+    return None, None
 
 def notify_main_program(nonce):
     """
@@ -72,11 +70,11 @@ def notify_main_program(nonce):
         - Return the response
     """
     try:
-        payload = {
+        payload = orjson.dumps({
             'nonce': nonce,
             'timestamp': time.time()
-        }
-        response = requests.post(f"{NODE_API_URL}/mining/result", json=payload)
+        })
+        response = _SESSION.post(f"{NODE_API_URL}/mining/result", data=payload, headers=_JSON_HEADERS)
         return response.json()
     except requests.exceptions.RequestException as e:
         logger.error(f"❌ Error notifying main program: {str(e)[:100]}...")
@@ -98,15 +96,20 @@ def mine():
     nonce_attempts = 0
     last_log_time = time.time()
     nonces_found = 0
+    # Start at a random point of the 64-bit nonce space and count upwards
+    nonce = random.getrandbits(64)
     
     while True:
-        # Generate a nonce
-        nonce = generate_nonce()
-        nonce_attempts += 1
-        
         # For simplicity, we'll hash just the nonce
         # In a real implementation, we would get the current block data from the main program
-        hash_string = calculate_hash(str(nonce))
+        found_nonce, hash_string = search_block(nonce, SEARCH_BATCH_SIZE)
+        
+        if found_nonce is None:
+            nonce_attempts += SEARCH_BATCH_SIZE
+            nonce = (nonce + SEARCH_BATCH_SIZE) & NONCE_MASK
+        else:
+            nonce_attempts += found_nonce - nonce + 1
+            nonce = (found_nonce + 1) & NONCE_MASK
         
         # 每30秒记录一次挖矿状态，表明挖矿程序仍在运行
         current_time = time.time()
@@ -116,16 +119,16 @@ def mine():
             nonces_found = 0
             last_log_time = current_time
         
-        if is_valid_proof(hash_string):
+        if found_nonce is not None:
             nonces_found += 1
-            logger.info(f"💎 Found valid nonce: {nonce}, hash: {hash_string[:16]}...")
-            response = notify_main_program(nonce)
+            logger.info(f"💎 Found valid nonce: {found_nonce}, hash: {hash_string[:16]}...")
+            response = notify_main_program(found_nonce)
             if response and response.get('accepted', False):
                 logger.info(f"✅ Nonce accepted by main program - New block created!")
             else:
                 logger.warning(f"❌ Nonce rejected by main program")
         
-        # Sleep to prevent CPU hogging
+        # Sleep between batches to prevent CPU hogging
         time.sleep(MINING_INTERVAL)
 
 def main():
@@ -137,7 +140,7 @@ def main():
     """
     # Configure the node API URL from environment if available
     import os
-    global NODE_API_URL, DIFFICULTY, MINING_INTERVAL
+    global NODE_API_URL, DIFFICULTY, MINING_INTERVAL, _ZERO_PREFIX
     
     # 配置日志级别
     log_level = os.environ.get('LOG_LEVEL', 'INFO')
@@ -153,6 +156,7 @@ def main():
     if difficulty:
         try:
             DIFFICULTY = int(difficulty)
+            _ZERO_PREFIX = '0' * DIFFICULTY
             logger.info(f"Mining difficulty set to {DIFFICULTY} from environment")
         except ValueError:
             logger.warning(f"Invalid MINING_DIFFICULTY '{difficulty}', using default {DIFFICULTY}")
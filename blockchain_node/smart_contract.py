@@ -4,14 +4,22 @@ Smart contract module for the blockchain system
 This module handles contract deployment, execution, and state management
 """
 
+import ast
+import builtins
+import functools
 import json
 import hashlib
 import logging
-import random
 import time
 import os
 import threading
+import traceback
 import pickle
+import secrets
+import symtable
+import types
+import weakref
+from collections import OrderedDict
 
 # Configure logger
 logging.basicConfig(
@@ -21,6 +29,418 @@ logging.basicConfig(
 )
 logger = logging.getLogger('smart_contract')
 
+class Contract:
+    """
+    Record of a deployed contract, stored in deployed_contracts by contract ID
+    
+    Attributes:
+        code: Contract source code
+        owner: Address of contract owner
+        factory: Compiled factory from build_contract_factory (None until compiled)
+        functions: Names of the callable contract functions (None until compiled)
+        reusable: Whether one factory namespace can serve every call (see _is_reusable)
+    """
+    __slots__ = ('code', 'owner', 'factory', 'functions', 'reusable')
+    
+    def __init__(self, code, owner, factory=None, functions=None, reusable=False):
+        self.code = code
+        self.owner = owner
+        self.factory = factory
+        self.functions = functions
+        self.reusable = reusable
+
+# Contract code is spliced into this function body, so the names contracts
+# rely on (get_state, args, ...) become closure variables rather than
+# globals, and the code only has to be compiled once at deployment.
+# _contract_bind rebinds the per-call values, so the body of a contract
+# without module-level state only has to run once per contract.
+_FACTORY_TEMPLATE = """
+def _contract_factory(contract_id, caller, args, get_state, set_state, contract_state_changes, time):
+    def _contract_bind(_caller, _args, _get_state, _set_state, _contract_state_changes):
+        nonlocal caller, args, get_state, set_state, contract_state_changes
+        caller = _caller
+        args = _args
+        get_state = _get_state
+        set_state = _set_state
+        contract_state_changes = _contract_state_changes
+    return locals()
+"""
+
+# Environment values passed to the factory, in order; they are bound in its
+# scope like the contract's own top-level names
+_FACTORY_ARGS = tuple(arg.arg for arg in ast.parse(_FACTORY_TEMPLATE).body[0].args.args)
+_FACTORY_PARAMS = frozenset(_FACTORY_ARGS)
+
+# LRU cache of prepared contract instances: contract_id -> (bind, dispatch)
+# built from the factory namespace. Only reusable contracts are cached, whose
+# namespaces hold no state, so evicting one never changes call results.
+# Bounded because block validation redeploys contracts under fresh IDs that
+# are never called again.
+CONTRACT_INSTANCE_CACHE_SIZE = 64
+_contract_instances = OrderedDict()
+_contract_instances_lock = threading.Lock()
+# Per-contract locks guarding rebinding and calling a contract namespace,
+# so calls into different contracts do not serialize on each other. Held
+# weakly: a lock nobody is using is dropped instead of piling up per ID.
+_contract_locks = weakref.WeakValueDictionary()
+_contract_locks_guard = threading.Lock()
+
+def _get_contract_lock(contract_id):
+    """
+    Get the lock for a contract, creating it if no caller currently holds one
+    
+    The caller must keep a reference to the lock for as long as it relies on it
+    (e.g. "with _get_contract_lock(contract_id):").
+    
+    Input:
+        contract_id: ID of the contract
+    Output:
+        lock: threading.RLock for this contract
+    """
+    lock = _contract_locks.get(contract_id)
+    if lock is None:
+        with _contract_locks_guard:
+            lock = _contract_locks.setdefault(contract_id, threading.RLock())
+    return lock
+
+def _get_cached_instance(contract_id):
+    """
+    Look up a prepared contract instance and mark it as recently used
+    
+    Input:
+        contract_id: ID of the contract
+    Output:
+        instance: (bind, dispatch) tuple, or None if not cached
+    """
+    with _contract_instances_lock:
+        instance = _contract_instances.get(contract_id)
+        if instance is not None:
+            _contract_instances.move_to_end(contract_id)
+        return instance
+
+def _cache_instance(contract_id, instance):
+    """
+    Store a prepared contract instance, evicting the least recently used one
+    
+    Input:
+        contract_id: ID of the contract
+        instance: (bind, dispatch) tuple built by _prepare_instance
+    Output: None
+    """
+    with _contract_instances_lock:
+        _contract_instances[contract_id] = instance
+        _contract_instances.move_to_end(contract_id)
+        if len(_contract_instances) > CONTRACT_INSTANCE_CACHE_SIZE:
+            _contract_instances.popitem(last=False)
+
+def _prepare_instance(contract, env):
+    """
+    Build the dispatch table for a freshly created contract namespace
+    
+    Input:
+        contract: Contract record
+        env: Contract namespace returned by the factory
+    Output:
+        instance: (bind, dispatch) where bind rebinds the per-call values and
+            dispatch maps each callable contract function name to its function
+    """
+    dispatch = {}
+    for name in contract.functions:
+        fn = env.get(name)
+        if callable(fn):
+            dispatch[name] = fn
+    return env['_contract_bind'], dispatch
+
+def _import_star(contract_globals, module, level):
+    """
+    Run "from module import *" for a contract, binding the names in its globals
+    
+    Input:
+        contract_globals: Globals dict of the contract namespace
+        module: Module name as written after "from" (None for "from . import *")
+        level: Number of leading dots of a relative import
+    Output: None
+    """
+    # Same lookup as the import statement, so failures raise the same ImportError
+    imported = __import__(module or '', contract_globals, None, ('*',), level)
+    exported = getattr(imported, '__all__', None)
+    if exported is None:
+        exported = [name for name in dir(imported) if not name.startswith('_')]
+    for name in exported:
+        contract_globals[name] = getattr(imported, name)
+
+class _StarImportRewriter(ast.NodeTransformer):
+    """
+    Replace top-level "from module import *", which is not allowed inside the
+    factory function, with a call to _contract_import_star; the module is
+    only imported when the contract runs, and its names land in the
+    namespace's globals like they did when contracts were exec'd
+    """
+    def __init__(self):
+        self.found = False  # Whether the contract has any star import
+    
+    def visit_ImportFrom(self, node):
+        if node.names[0].name != '*':
+            return node
+        self.found = True
+        call = ast.Call(
+            func=ast.Name('_contract_import_star', ast.Load()),
+            args=[ast.Constant(node.module), ast.Constant(node.level)],
+            keywords=[]
+        )
+        return ast.copy_location(ast.Expr(call), node)
+    
+    # Star imports are only valid at module level
+    def visit_FunctionDef(self, node):
+        return node
+    visit_AsyncFunctionDef = visit_ClassDef = visit_FunctionDef
+
+class _GlobalRewriter(ast.NodeTransformer):
+    """
+    Rewrite "global" declarations inside contract functions to "nonlocal" ones
+    referring to the factory's locals; module-level declarations are dropped
+    """
+    def __init__(self, declarable):
+        self.declarable = declarable  # Names bound in the factory scope
+        self.depth = 0
+    
+    def visit_scope(self, node):
+        self.depth += 1
+        self.generic_visit(node)
+        self.depth -= 1
+        return node
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = visit_scope
+    
+    def visit_Global(self, node):
+        # Names bound nowhere in the factory keep resolving to builtins
+        names = [name for name in node.names if name in self.declarable] if self.depth else []
+        if not names:
+            return ast.copy_location(ast.Pass(), node)
+        return ast.copy_location(ast.Nonlocal(names=names), node)
+
+def _rewrite_globals(code, tree, extra_names):
+    """
+    Make "global" declarations work inside the factory, where the contract's
+    top-level names are closure variables rather than module globals
+    
+    Input:
+        code: Contract code (string)
+        tree: Parsed contract module (modified in place)
+        extra_names: Names the factory binds besides the contract's own
+            top-level assignments (its parameters)
+    Output: None
+    Raises:
+        SyntaxError: If a global declaration would resolve to a local of an
+            enclosing contract function instead
+    """
+    module_table = symtable.symtable(code, '<contract>', 'exec')
+    top_level_names = set(
+        symbol.get_name() for symbol in module_table.get_symbols() if symbol.is_assigned()
+    ) | extra_names
+    # Names only ever assigned through a global declaration still need a
+    # binding in the factory for nonlocal to refer to
+    unbound = set()
+    
+    def check(table, enclosing):
+        for symbol in table.get_symbols():
+            if not symbol.is_declared_global():
+                continue
+            name = symbol.get_name()
+            for outer in enclosing:
+                if name not in outer.get_identifiers():
+                    continue
+                outer_symbol = outer.lookup(name)
+                if outer_symbol.is_local() and not outer_symbol.is_declared_global():
+                    raise SyntaxError(
+                        f"global '{name}' in {table.get_name()}() is shadowed by a local "
+                        f"of enclosing function {outer.get_name()}()"
+                    )
+            if symbol.is_assigned() and name not in top_level_names:
+                unbound.add(name)
+        if isinstance(table, symtable.Function):
+            enclosing = enclosing + [table]
+        for child in table.get_children():
+            check(child, enclosing)
+    
+    for child in module_table.get_children():
+        check(child, [])
+    
+    _GlobalRewriter(top_level_names | unbound).visit(tree)
+    
+    # name = None; del name declares the name in the factory but leaves it unbound
+    cells = []
+    for name in sorted(unbound):
+        cells.append(ast.Assign(targets=[ast.Name(name, ast.Store())], value=ast.Constant(None)))
+        cells.append(ast.Delete(targets=[ast.Name(name, ast.Del())]))
+    tree.body[0:0] = cells
+
+# Builtins that can reach the contract namespace indirectly; contracts
+# calling them are never reusable
+_UNSAFE_BUILTINS = frozenset([
+    'eval', 'exec', 'compile', 'getattr', 'setattr', 'globals', 'locals', 'vars',
+    '__import__', 'breakpoint'
+])
+# Environment names _contract_bind rebinds on every call of a cached namespace
+_REBOUND_NAMES = frozenset(['caller', 'args', 'get_state', 'set_state', 'contract_state_changes'])
+
+def _is_immutable_literal(node):
+    """
+    Check whether an expression is a constant, a negated constant or a tuple of them
+    
+    Input:
+        node: AST expression
+    Output:
+        immutable: Boolean
+    """
+    if isinstance(node, ast.UnaryOp):
+        node = node.operand
+    if isinstance(node, ast.Tuple):
+        return all(_is_immutable_literal(elt) for elt in node.elts)
+    return isinstance(node, ast.Constant)
+
+def _is_reusable(tree):
+    """
+    Check whether running the contract body once can serve every call
+    
+    Each call used to run the body in a fresh namespace. Reusing one namespace
+    only gives the same results if nothing in it can carry state between
+    calls: the top level may only define plain functions, bind immutable
+    constants and import modules (none of them shadowing a name _contract_bind
+    rebinds), and the functions may not rebind top-level names, reach the
+    namespace indirectly or use their function objects as values.
+    
+    Input:
+        tree: Parsed contract module
+    Output:
+        reusable: Boolean
+    """
+    function_names = set()
+    top_level_names = set()
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            if node.decorator_list:
+                return False
+            defaults = node.args.defaults + [d for d in node.args.kw_defaults if d is not None]
+            if not all(_is_immutable_literal(default) for default in defaults):
+                return False
+            function_names.add(node.name)
+            top_level_names.add(node.name)
+        elif isinstance(node, ast.Assign):
+            if not (all(isinstance(target, ast.Name) for target in node.targets)
+                    and _is_immutable_literal(node.value)):
+                return False
+            top_level_names.update(target.id for target in node.targets)
+        elif isinstance(node, ast.AnnAssign):
+            if not (isinstance(node.target, ast.Name)
+                    and (node.value is None or _is_immutable_literal(node.value))):
+                return False
+            top_level_names.add(node.target.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            # A star import may bind any name
+            if node.names[0].name == '*':
+                return False
+            top_level_names.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.Expr):
+            # Only a docstring; any other expression may have side effects
+            if not (isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+                return False
+        elif not isinstance(node, ast.Pass):
+            return False
+    
+    # A cached namespace would see _contract_bind overwrite these bindings
+    if top_level_names & _REBOUND_NAMES:
+        return False
+    
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        called = set(id(call.func) for call in ast.walk(node) if isinstance(call, ast.Call))
+        for child in ast.walk(node):
+            if isinstance(child, (ast.Global, ast.Nonlocal)):
+                return False
+            if isinstance(child, ast.Name):
+                if child.id in _UNSAFE_BUILTINS:
+                    return False
+                # Function objects are shared between calls, so their attributes are state
+                if child.id in function_names and id(child) not in called:
+                    return False
+    return True
+
+def build_contract_factory(code):
+    """
+    Compile contract code into a factory for its execution environment
+    
+    Input:
+        code: Contract code (string)
+    Output:
+        (factory, functions, reusable): factory takes the environment values
+            (contract_id, caller, args, get_state, set_state,
+            contract_state_changes, time) and returns the contract namespace;
+            functions is the set of callable top-level function names;
+            reusable tells whether the namespace can be kept between calls
+    """
+    # Validate code as a standalone module first
+    compile(code, '<string>', 'exec')
+    
+    tree = ast.parse(code, '<contract>')
+    functions = frozenset(node.name for node in tree.body if isinstance(node, ast.FunctionDef))
+    reusable = _is_reusable(tree)
+    
+    # Adapt module-level constructs to running inside the factory function
+    star_imports = _StarImportRewriter()
+    star_imports.visit(tree)
+    has_star_imports = star_imports.found
+    _rewrite_globals(code, tree, _FACTORY_PARAMS)
+    
+    wrapper = ast.parse(_FACTORY_TEMPLATE)
+    factory_def = wrapper.body[0]
+    factory_def.body = tree.body + factory_def.body  # Contract body runs before _contract_bind is defined
+    ast.fix_missing_locations(wrapper)
+    
+    namespace = {}
+    exec(compile(wrapper, '<contract>', 'exec'), namespace)
+    factory_code = namespace['_contract_factory'].__code__
+    
+    def factory(*env_values):
+        # Every namespace gets its own globals, laid out like the exec()
+        # environment contracts used to run in, so globals() is never shared
+        # between calls or between contracts compiled from the same code
+        contract_globals = dict(zip(_FACTORY_ARGS, env_values), __builtins__=builtins.__dict__)
+        if has_star_imports:
+            contract_globals['_contract_import_star'] = functools.partial(_import_star, contract_globals)
+        env = types.FunctionType(factory_code, contract_globals)(*env_values)
+        contract_globals.update((name, value) for name, value in env.items() if name != '_contract_bind')
+        return env
+    
+    return factory, functions, reusable
+
+@functools.lru_cache(maxsize=128)
+def _compile_cached(code):
+    """
+    Compile contract code, sharing the result between identical deployments
+    
+    Input:
+        code: Contract code (string)
+    Output:
+        (factory, functions, reusable): See build_contract_factory
+    """
+    return build_contract_factory(code)
+
+def _ensure_compiled(deployed_contracts, contract_id):
+    """
+    Get a stored contract, compiling it on first use if it was created without its factory
+    
+    Input:
+        deployed_contracts: Deployed contracts database from main.py
+        contract_id: ID of the contract
+    Output:
+        contract: Contract record with factory, functions and reusable filled in
+    """
+    contract = deployed_contracts[contract_id]
+    if contract.factory is None:
+        contract.factory, contract.functions, contract.reusable = _compile_cached(contract.code)
+    return contract
+
 def generate_contract_id(code, owner):
     """
     Generate a unique ID for a contract based on its code and owner
@@ -31,10 +451,12 @@ def generate_contract_id(code, owner):
     Output:
         contract_id: Unique contract ID
     """
-    # Create a string combining code and owner with timestamp for uniqueness
-    combined = f"{code}{owner}{time.time()}{random.randint(0, 1000000)}"
-    # Hash the combined string to create a unique ID
-    return hashlib.sha256(combined.encode('utf-8')).hexdigest()[:16]
+    # Hash code and owner together with random bytes for uniqueness,
+    # feeding them in pieces instead of building one combined string
+    h = hashlib.sha256(code.encode('utf-8'))
+    h.update(owner.encode('utf-8'))
+    h.update(secrets.token_bytes(16))
+    return h.hexdigest()[:16]
 
 def deploy_contract(code, owner, contract_state_db=None, deployed_contracts=None):
     """
@@ -50,145 +472,210 @@ def deploy_contract(code, owner, contract_state_db=None, deployed_contracts=None
     """
     # For simplicity, we'll check if code is valid by trying to compile it
     try:
-        # Validate code
-        compile(code, '<string>', 'exec')
+        # Validate and compile code (identical code is only compiled once)
+        factory, functions, reusable = _compile_cached(code)
         
         # Generate contract ID
         contract_id = generate_contract_id(code, owner)
         
         # Store contract if we have the state database
         if deployed_contracts is not None:
-            deployed_contracts[contract_id] = {
-                'code': code,
-                'owner': owner
-            }
+            # Drop any namespace prepared for a previous contract under this ID
+            with _contract_instances_lock:
+                _contract_instances.pop(contract_id, None)
+            deployed_contracts[contract_id] = Contract(code, owner, factory, functions, reusable)
         
-        logger.info(f"📄 Deployed contract with ID: {contract_id} by {owner[:8]}...")
+        logger.info("📄 Deployed contract with ID: %s by %s...", contract_id, owner[:8])
         return {
             'success': True,
             'output': "Success",
             'contract_id': contract_id
         }
     except Exception as e:
-        logger.warning(f"❌ Contract deployment failed: {str(e)}")
+        logger.warning("❌ Contract deployment failed: %s", e)
         return {
             'success': False,
             'output': f"Fail: {str(e)}"
         }
 
-def execute_contract(contract_id, caller, function, args=None, contract_state_db=None, deployed_contracts=None):
+def _call_contract(contract_id, contract, contract_state, caller, function, args):
     """
-    Execute a function in a deployed contract
+    Run one contract call; the caller must hold the contract's lock
     
     Input:
-        contract_id: ID of the contract to execute
+        contract_id: ID of the contract
+        contract: Compiled Contract record
+        contract_state: State dictionary of this contract
         caller: Address of the caller
         function: Function name to call
         args: Arguments for the function (dictionary)
-        contract_state_db: Contract state database from main.py (optional)
-        deployed_contracts: Deployed contracts database from main.py (optional)
     Output:
         result: Dictionary containing execution result and state changes
     """
-    logger.info(f"🔄 Executing contract {contract_id}, function: {function}, caller: {caller[:8]}...")
-    logger.info(f"🔧 Function args: {args}")
-    
-    # If we don't have the state databases, we can't execute the contract
-    if contract_state_db is None or deployed_contracts is None:
-        logger.warning(f"❌ Contract state databases not provided")
-        return {
-            'success': False,
-            'output': f"Fail: Contract state databases not provided"
-        }
-    
-    # Check if contract exists
-    if contract_id not in deployed_contracts:
-        logger.warning(f"❌ Contract {contract_id} not found")
-        return {
-            'success': False,
-            'output': f"Fail: Contract not found"
-        }
-    
-    # Get the contract code
-    contract = deployed_contracts[contract_id]
-    code = contract['code']
-    
-    # Log current contract state
-    current_state = {}
-    for key in contract_state_db:
-        if key.startswith(f"{contract_id}-"):
-            var_name = key[len(contract_id)+1:]
-            current_state[var_name] = contract_state_db[key]
-    
-    logger.info(f"📊 Current contract state: {current_state}")
-    
     # Create contract environment
     contract_state_changes = {}
+    prefix = contract_id + "-"
     
-    # Function to get contract state
+    # Function to get contract state (closes over the bound dict lookup)
+    state_get = contract_state.get
     def get_state(key):
-        full_key = f"{contract_id}-{key}"
-        return contract_state_db.get(full_key)
+        return state_get(key)
     
     # Function to set contract state
     def set_state(key, value):
-        full_key = f"{contract_id}-{key}"
-        contract_state_db[full_key] = value
+        contract_state[key] = value
         contract_state_changes[key] = value
-        return full_key, value
-    
-    # Prepare execution environment
-    env = {
-        'contract_id': contract_id,  # Pass contract ID
-        'caller': caller,
-        'args': args or {},  # Provide global args dictionary
-        'get_state': get_state,
-        'set_state': set_state,
-        'contract_state_changes': contract_state_changes,  # To track state changes
-        'time': time,  # Add time module for contract use
-    }
+        return f"{prefix}{key}", value
     
     try:
-        # Execute the contract code in the prepared environment
-        # In a real implementation, we would use a sandbox for security
-        logger.info(f"🧪 Compiling contract code...")
-        exec(code, env)
+        # Contracts with module-level state get a fresh namespace every call
+        instance = _get_cached_instance(contract_id) if contract.reusable else None
+        if instance is None:
+            # Run the contract body to define its functions
+            # In a real implementation, we would use a sandbox for security
+            logger.info("🧪 Loading contract functions...")
+            env = contract.factory(
+                contract_id,  # Pass contract ID
+                caller,
+                args or {},  # Provide global args dictionary
+                get_state,
+                set_state,
+                contract_state_changes,  # To track state changes
+                time  # Add time module for contract use
+            )
+            instance = _prepare_instance(contract, env)
+            if contract.reusable:
+                _cache_instance(contract_id, instance)
+        else:
+            instance[0](caller, args or {}, get_state, set_state, contract_state_changes)
         
-        # Check if the requested function exists
-        if function not in env:
-            logger.warning(f"❌ Function {function} not found in contract {contract_id}")
+        # Check if function exists
+        fn = instance[1].get(function)
+        if fn is None:
+            logger.warning("❌ Function %s not found in contract %s", function, contract_id)
             return {
                 'success': False,
                 'output': f"Fail: Function {function} not found"
             }
         
         # Execute function
-        logger.info(f"🚀 Calling function {function}...")
-        result = env[function]()  # Always don't pass any arguments, as contract functions will get parameters from global args
-        logger.info(f"✅ Function execution result: {result}")
+        logger.info("🚀 Calling function %s...", function)
+        result = fn()  # Always don't pass any arguments, as contract functions will get parameters from global args
+        logger.info("✅ Function execution result: %s", result)
         
         # Collect state changes
         state_changes = []
         for key, value in contract_state_changes.items():
-            full_key = f"{contract_id}-{key}"
-            state_changes.append(f"{full_key}:{value}")
+            state_changes.append(f"{prefix}{key}:{value}")
         
-        logger.info(f"📝 State changes: {state_changes}")
+        logger.info("📝 State changes: %s", state_changes)
         
         return {
             'success': True,
             'output': state_changes if state_changes else "Success"
         }
     except Exception as e:
-        logger.warning(f"❌ Contract execution failed: {str(e)}")
+        logger.warning("❌ Contract execution failed: %s", e)
         # Log the exception traceback for debugging
-        import traceback
-        logger.error(f"Exception traceback: {traceback.format_exc()}")
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error("Exception traceback: %s", traceback.format_exc())
         return {
             'success': False,
             'output': f"Fail: {str(e)}"
         }
 
+def execute_contract(contract_id, caller, function, args=None, contract_state_db=None, deployed_contracts=None):
+    """
+    Execute a function in a deployed contract
+    
+    Input:
+        contract_id: ID of the contract to execute
+        caller: Address of the caller
+        function: Function name to call
+        args: Arguments for the function (dictionary)
+        contract_state_db: Contract state database from main.py (optional)
+        deployed_contracts: Deployed contracts database from main.py (optional)
+    Output:
+        result: Dictionary containing execution result and state changes
+    """
+    logger.info("🔄 Executing contract %s, function: %s, caller: %s...", contract_id, function, caller[:8])
+    logger.info("🔧 Function args: %s", args)
+    
+    # If we don't have the state databases, we can't execute the contract
+    if contract_state_db is None or deployed_contracts is None:
+        logger.warning("❌ Contract state databases not provided")
+        return {
+            'success': False,
+            'output': f"Fail: Contract state databases not provided"
+        }
+    
+    # Check if contract exists
+    if contract_id not in deployed_contracts:
+        logger.warning("❌ Contract %s not found", contract_id)
+        return {
+            'success': False,
+            'output': f"Fail: Contract not found"
+        }
+    
+    # Get the compiled contract
+    contract = _ensure_compiled(deployed_contracts, contract_id)
+    
+    # Log current contract state (only materialized when INFO logging is on)
+    if logger.isEnabledFor(logging.INFO):
+        current_state = contract_state_db.get(contract_id, {})
+        logger.info("📊 Current contract state: %s", current_state)
+    
+    contract_state = contract_state_db.setdefault(contract_id, {})
+    with _get_contract_lock(contract_id):
+        return _call_contract(contract_id, contract, contract_state, caller, function, args)
+
+def execute_contract_batch(calls, contract_state_db=None, deployed_contracts=None):
+    """
+    Execute a list of contract calls, taking each contract's lock only once
+    
+    Calls are grouped by contract. Calls to the same contract keep their
+    relative order; different contracts have separate state, so running
+    them group by group gives the same results as running them one by one.
+    
+    Input:
+        calls: List of (contract_id, caller, function, args) tuples
+        contract_state_db: Contract state database from main.py (optional)
+        deployed_contracts: Deployed contracts database from main.py (optional)
+    Output:
+        results: List of result dictionaries, in the same order as calls
+    """
+    if contract_state_db is None or deployed_contracts is None:
+        logger.warning("❌ Contract state databases not provided")
+        return [{
+            'success': False,
+            'output': "Fail: Contract state databases not provided"
+        } for _ in calls]
+    
+    # Group call positions by contract
+    groups = {}
+    for i, call in enumerate(calls):
+        groups.setdefault(call[0], []).append(i)
+    
+    results = [None] * len(calls)
+    for contract_id, indices in groups.items():
+        if contract_id not in deployed_contracts:
+            logger.warning("❌ Contract %s not found", contract_id)
+            for i in indices:
+                results[i] = {
+                    'success': False,
+                    'output': "Fail: Contract not found"
+                }
+            continue
+        
+        logger.info("🔄 Executing %d calls on contract %s", len(indices), contract_id)
+        contract = _ensure_compiled(deployed_contracts, contract_id)
+        contract_state = contract_state_db.setdefault(contract_id, {})
+        with _get_contract_lock(contract_id):
+            for i in indices:
+                _, caller, function, args = calls[i]
+                results[i] = _call_contract(contract_id, contract, contract_state, caller, function, args)
+    
+    return results
 
 
 def get_contract(contract_id, deployed_contracts=None):
@@ -199,18 +686,14 @@ def get_contract(contract_id, deployed_contracts=None):
         contract_id: ID of the contract
         deployed_contracts: Deployed contracts database from main.py (optional)
     Output: 
-        Contract dictionary or None
+        Contract record or None
     """
     if deployed_contracts is None:
         return None
     return deployed_contracts.get(contract_id)
 
 # Example contracts
-def create_transfer_contract():
-    """
-    Create a simple transfer contract for testing
-    """
-    code = """
+_TRANSFER_CODE = """
 def init():
     set_state('balance', 0)
     return "Transfer contract initialized"
@@ -236,16 +719,8 @@ def withdraw():
 def get_balance():
     return get_state('balance') or 0
 """
-    return code
 
-def create_auction_contract():
-    """
-    Create a simple auction contract for testing
-    
-    Input: None
-    Output: Contract code as string
-    """
-    code = """
+_AUCTION_CODE = """
 def init():
     # Initialize auction state
     set_state('highest_bid', 0)
@@ -307,7 +782,52 @@ def get_status():
         'item_description': get_state('item_description')
     }
 """
-    return code
+
+# Built-in contract sources by name; compiled once at import so deploying
+# them never has to compile
+_BUILTIN_CONTRACTS = {
+    'transfer': _TRANSFER_CODE,
+    'auction': _AUCTION_CODE,
+}
+for _code in _BUILTIN_CONTRACTS.values():
+    _compile_cached(_code)
+
+def create_transfer_contract():
+    """
+    Create a simple transfer contract for testing
+    """
+    return _TRANSFER_CODE
+
+def create_auction_contract():
+    """
+    Create a simple auction contract for testing
+    
+    Input: None
+    Output: Contract code as string
+    """
+    return _AUCTION_CODE
+
+def deploy_builtin_contract(name, owner, contract_state_db=None, deployed_contracts=None):
+    """
+    Deploy one of the built-in example contracts
+    
+    Input:
+        name: Built-in contract name ('transfer' or 'auction')
+        owner: Address of contract owner
+        contract_state_db: Contract state database from main.py (optional)
+        deployed_contracts: Deployed contracts database from main.py (optional)
+    Output:
+        result: Dictionary containing deployment result and contract ID if successful
+    """
+    code = _BUILTIN_CONTRACTS.get(name)
+    if code is None:
+        logger.warning("❌ Unknown built-in contract: %s", name)
+        return {
+            'success': False,
+            'output': f"Fail: Unknown built-in contract {name}"
+        }
+    # The source was precompiled at import, so this reuses the cached factory
+    return deploy_contract(code, owner, contract_state_db, deployed_contracts)
 
 # # For testing
 # if __name__ == "__main__":
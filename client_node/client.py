@@ -6,63 +6,94 @@ This client generates and sends transactions to blockchain nodes
 
 import time
 import json
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
 import random
 import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 import threading
-from datetime import datetime
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import hashes, serialization
+import orjson
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives import serialization
 
 # Constants
 TRANSACTION_INTERVAL = 0.01  # 10ms between transactions
+BATCH_INTERVAL = 0.05  # Flush queued transactions to the nodes every 50ms
+BALANCE_POLL_INTERVAL = 1  # Refresh cached balances from the node every second
 NODE_ADDRESSES = []  # Will be populated with blockchain node addresses from env vars
 MAX_ACCOUNTS = 5  # Number of accounts to simulate
 
+logger = logging.getLogger('client')
+
+# Batch endpoint URL for each node, built once in main()
+_BATCH_URLS = []
+
+# Shared HTTP session so requests to the nodes reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=0))
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+@dataclass
+class Account:
+    """
+    Simulated account with its key material and precomputed address
+    
+    Attributes:
+        private_key: Ed25519 private key
+        public_key_bytes: Raw 32-byte public key
+        address: SHA-256 hex digest of public_key_bytes
+        address_bytes: UTF-8 encoding of address, used when building signing messages
+        balance_url: Balance endpoint URL for this account, set once nodes are configured
+    """
+    private_key: object
+    public_key_bytes: bytes
+    address: str
+    address_bytes: bytes
+    balance_url: str = ''
+
 # Global variables
-accounts = []  # List of (private_key, public_key, public_key_str) tuples
+accounts = []  # List of Account objects
+fanout_executor = None  # Thread pool posting each batch to all nodes at once
+queued_transactions = deque()  # Transactions waiting for the next batch
+queue_lock = threading.Lock()
+balances = {}  # Estimated balance per address, refreshed by balance_poller
+balances_lock = threading.Lock()
 
 def generate_keypair():
     """
-    Generate RSA keypair
+    Generate Ed25519 keypair
     
     Input: None
-    Output: (private_key, public_key, public_key_str)
+    Output: Account with the private key, public key bytes and address
     """
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048
-    )
+    private_key = ed25519.Ed25519PrivateKey.generate()
     public_key = private_key.public_key()
     
     # Get string representation of public key for addresses
     public_key_bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
     )
     public_key_str = hashlib.sha256(public_key_bytes).hexdigest()
     
-    return private_key, public_key, public_key_str
+    return Account(private_key, public_key_bytes, public_key_str, public_key_str.encode('utf-8'))
 
-def sign_message(private_key, message):
+def sign_message(private_key, message_bytes):
     """
     Sign a message with private key
     
     Input: 
-        private_key: RSA private key
-        message: String to sign
+        private_key: Ed25519 private key
+        message_bytes: UTF-8 encoded message to sign
     Output: 
-        signature: Bytes of the signature
-    """
-    message_bytes = message.encode('utf-8')
-    signature = private_key.sign(
-        message_bytes,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
+        signature: Hex string of the signature
+    """
+    signature = private_key.sign(message_bytes)
     return signature.hex()  # Convert to hex string for easier handling
 
 def create_transaction(from_account, to_account, value):
@@ -70,8 +101,8 @@ def create_transaction(from_account, to_account, value):
     Create a transaction
     
     Input:
-        from_account: (private_key, public_key, public_key_str) of sender
-        to_account: (private_key, public_key, public_key_str) of receiver
+        from_account: Account of sender
+        to_account: Account of receiver
         value: Amount to transfer
     Output:
         transaction: Transaction dict
@@ -79,15 +110,20 @@ def create_transaction(from_account, to_account, value):
         - Create transaction with timestamp, from, to, value
         - Sign the transaction
     """
-    timestamp = time.time()
-    from_address = from_account[2]  # public_key_str
-    to_address = to_account[2]  # public_key_str
+    timestamp = time.time_ns()  # Integer nanoseconds format faster than float seconds
+    from_address = from_account.address
+    to_address = to_account.address
     
-    # Create message to sign
-    message = f"{timestamp},{from_address},{to_address},{value}"
+    # Create message to sign ("timestamp,from,to,value") from the pre-encoded addresses
+    message_bytes = b','.join((
+        str(timestamp).encode('utf-8'),
+        from_account.address_bytes,
+        to_account.address_bytes,
+        str(value).encode('utf-8')
+    ))
     
     # Sign the message
-    signature = sign_message(from_account[0], message)
+    signature = sign_message(from_account.private_key, message_bytes)
     
     # Create transaction
     transaction = {
@@ -100,40 +136,90 @@ def create_transaction(from_account, to_account, value):
     
     return transaction
 
-def send_transaction(transaction):
+def post_batch(node_address, url, body, count):
     """
-    Send transaction to all blockchain nodes
+    Send a batch of transactions to a single blockchain node
     
     Input:
-        transaction: Transaction dict
+        node_address: Address of the node
+        url: Batch endpoint URL of the node
+        body: JSON-encoded {"transactions": [...]} request body
+        count: Number of transactions in the batch
     Output:
-        success: Boolean indicating if at least one node accepted the transaction
-    TODO:
-        - Send transaction to all known nodes
-        - Return True if at least one node accepted it
+        accepted: Boolean indicating if the node accepted any of the transactions
     """
-    success = False
+    try:
+        response = _SESSION.post(url, data=body, headers=_JSON_HEADERS)
+        if response.status_code == 201:
+            logger.info("%s/%d transactions accepted by %s", response.json().get('accepted', count), count, node_address)
+            return True
+        else:
+            logger.warning("Transactions rejected by %s: %s", node_address, response.json())
+    except requests.exceptions.RequestException as e:
+        logger.error("Error sending transactions to %s: %s", node_address, e)
+    except ValueError as e:
+        # Response body was not JSON (e.g. an HTML error page)
+        logger.error("Invalid response from %s: %s", node_address, e)
     
-    for node_address in NODE_ADDRESSES:
+    return False
+
+def send_transactions(transactions):
+    """
+    Send a batch of transactions to all blockchain nodes
+    
+    Input:
+        transactions: List of transaction dicts
+    Output:
+        success: Boolean indicating if at least one node accepted the batch
+    """
+    # Encode once and post the same bytes to every node concurrently
+    body = orjson.dumps({'transactions': transactions})
+    futures = [fanout_executor.submit(post_batch, node_address, url, body, len(transactions))
+               for node_address, url in zip(NODE_ADDRESSES, _BATCH_URLS)]
+    results = [future.result() for future in futures]
+    
+    return any(results)
+
+def queue_transaction(transaction):
+    """
+    Queue a transaction for the next batch
+    
+    Input:
+        transaction: Transaction dict
+    Output: None
+    """
+    with queue_lock:
+        queued_transactions.append(transaction)
+
+def transaction_flusher():
+    """
+    Periodically send all queued transactions as one batch
+    
+    Input: None
+    Output: None
+    """
+    while True:
+        time.sleep(BATCH_INTERVAL)
+        
+        with queue_lock:
+            if not queued_transactions:
+                continue
+            batch = list(queued_transactions)
+            queued_transactions.clear()
+        
+        # Keep the only flusher thread alive whatever goes wrong with one batch
         try:
-            response = requests.post(f"http://{node_address}/transactions/new", 
-                                    json=transaction)
-            if response.status_code == 201:
-                success = True
-                print(f"[{datetime.now()}] Transaction accepted by {node_address}")
-            else:
-                print(f"[{datetime.now()}] Transaction rejected by {node_address}: {response.json()}")
-        except requests.exceptions.RequestException as e:
-            print(f"[{datetime.now()}] Error sending transaction to {node_address}: {e}")
-    
-    return success
+            if not send_transactions(batch):
+                logger.warning("Failed to send batch of %d transactions", len(batch))
+        except Exception:
+            logger.exception("Error sending batch of %d transactions", len(batch))
 
 def get_account_balance(account):
     """
     Get balance of an account from a blockchain node
     
     Input:
-        account: (private_key, public_key, public_key_str)
+        account: Account
     Output:
         balance: Account balance
     TODO:
@@ -146,59 +232,102 @@ def get_account_balance(account):
     # Try the first node
     node_address = NODE_ADDRESSES[0]
     try:
-        response = requests.get(f"http://{node_address}/balance/{account[2]}")
+        response = _SESSION.get(account.balance_url)
         if response.status_code == 200:
             return response.json().get('balance', 0)
     except requests.exceptions.RequestException as e:
-        print(f"[{datetime.now()}] Error getting balance from {node_address}: {e}")
+        logger.error("Error getting balance from %s: %s", node_address, e)
+    except ValueError as e:
+        # Response body was not JSON (e.g. an HTML error page)
+        logger.error("Invalid balance response from %s: %s", node_address, e)
     
     return 0
 
-def transaction_generator():
+def balance_poller():
     """
-    Generate and send transactions periodically
+    Periodically refresh the cached balances of all accounts from a node
     
     Input: None
     Output: None
+    """
+    while True:
+        for account in accounts:
+            balance = get_account_balance(account)
+            with balances_lock:
+                balances[account.address] = balance
+        
+        time.sleep(BALANCE_POLL_INTERVAL)
+
+def transaction_generator(bucket):
+    """
+    Generate and send transactions periodically
+    
+    Input:
+        bucket: List of at least two Account objects owned by this worker
+    Output: None
     TODO:
         - Periodically create random transactions
         - Send them to blockchain nodes
     """
+    next_deadline = time.monotonic()
     while True:
-        # Select random sender and receiver
-        from_idx = random.randint(0, len(accounts) - 1)
-        to_idx = random.randint(0, len(accounts) - 1)
+        # Wait for the next scheduled slot; slow iterations shorten the wait so the rate holds
+        delay = next_deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        next_deadline += TRANSACTION_INTERVAL
         
-        # Make sure sender and receiver are different
-        while to_idx == from_idx:
-            to_idx = random.randint(0, len(accounts) - 1)
+        # Select two different random accounts as sender and receiver
+        from_account, to_account = random.sample(bucket, 2)
         
-        from_account = accounts[from_idx]
-        to_account = accounts[to_idx]
-        
-        # Get sender's balance
-        balance = get_account_balance(from_account)
+        # Get sender's estimated balance from the local cache
+        with balances_lock:
+            balance = balances.get(from_account.address, 0)
         
         # Skip if sender has no funds
         if balance <= 0:
-            time.sleep(TRANSACTION_INTERVAL)
             continue
         
         # Create a random value to transfer (up to 10% of balance)
         value = random.uniform(1, max(1, balance * 0.1))
         value = round(value, 2)  # Round to 2 decimal places
         
-        # Create and send transaction
+        # Create transaction and queue it for the next batch
         transaction = create_transaction(from_account, to_account, value)
-        success = send_transaction(transaction)
+        queue_transaction(transaction)
         
-        if success:
-            print(f"[{datetime.now()}] Created transaction: {from_account[2][:8]}... -> {to_account[2][:8]}..., {value} BTC")
-        else:
-            print(f"[{datetime.now()}] Failed to send transaction")
+        # Update balances optimistically until the next poll reconciles them
+        with balances_lock:
+            balances[from_account.address] = balances.get(from_account.address, 0) - value
+            balances[to_account.address] = balances.get(to_account.address, 0) + value
         
-        # Wait before next transaction
-        time.sleep(TRANSACTION_INTERVAL)
+        logger.info("Created transaction: %.8s... -> %.8s..., %s BTC", from_account.address, to_account.address, value)
+
+def configure_logging(log_level):
+    """
+    Send client logs through a queue so stream output runs on a listener thread
+    
+    Records are still formatted by QueueHandler in the thread that logs them;
+    only the write to stderr moves off the generator threads.
+    
+    Input:
+        log_level: Level name such as "INFO" or "DEBUG"
+    Output:
+        listener: Started QueueListener writing to stderr
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s [%(levelname)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    logger.propagate = False
+    
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
 
 def main():
     """
@@ -207,10 +336,12 @@ def main():
     Input: None
     Output: None
     """
-    global NODE_ADDRESSES, accounts
+    global NODE_ADDRESSES, accounts, fanout_executor
     
-    # Configure node addresses from environment variables
     import os
+    log_listener = configure_logging(os.environ.get('LOG_LEVEL', 'INFO'))
+    
+    # Configure node addresses from environment variables
     nodes = os.environ.get('NODES', '').split(',')
     for node in nodes:
         if node:
@@ -220,25 +351,54 @@ def main():
         # Default to localhost if no nodes specified
         NODE_ADDRESSES.append("localhost:5000")
     
-    print(f"[{datetime.now()}] Client started. Connected to nodes: {NODE_ADDRESSES}")
+    logger.info("Client started. Connected to nodes: %s", NODE_ADDRESSES)
+    
+    fanout_executor = ThreadPoolExecutor(max_workers=len(NODE_ADDRESSES))
+    _BATCH_URLS.extend(f"http://{node}/transactions/batch" for node in NODE_ADDRESSES)
+    
+    # Generate accounts in parallel
+    with ThreadPoolExecutor(max_workers=MAX_ACCOUNTS) as executor:
+        futures = [executor.submit(generate_keypair) for _ in range(MAX_ACCOUNTS)]
+        for i, future in enumerate(futures):
+            account = future.result()
+            account.balance_url = f"http://{NODE_ADDRESSES[0]}/balance/{account.address}"
+            accounts.append(account)
+            logger.info("Generated account %d: %s", i + 1, account.address)
+    
+    # Start balance poller in a separate thread
+    balance_thread = threading.Thread(target=balance_poller)
+    balance_thread.daemon = True
+    balance_thread.start()
+    
+    # Configure number of generator threads (default: one per CPU)
+    worker_count = os.cpu_count() or 1
+    generator_threads = os.environ.get('GENERATOR_THREADS')
+    if generator_threads:
+        try:
+            worker_count = int(generator_threads)
+        except ValueError:
+            logger.warning("Invalid GENERATOR_THREADS '%s', using default %d", generator_threads, worker_count)
+    # Every worker needs at least two accounts of its own
+    worker_count = max(1, min(worker_count, len(accounts) // 2))
     
-    # Generate accounts
-    for i in range(MAX_ACCOUNTS):
-        account = generate_keypair()
-        accounts.append(account)
-        print(f"[{datetime.now()}] Generated account {i+1}: {account[2]}")
+    # Start transaction generators, each over a disjoint bucket of accounts
+    for i in range(worker_count):
+        tx_thread = threading.Thread(target=transaction_generator, args=(accounts[i::worker_count],))
+        tx_thread.daemon = True
+        tx_thread.start()
+    logger.info("Started %d transaction generator threads", worker_count)
     
-    # Start transaction generator in a separate thread
-    tx_thread = threading.Thread(target=transaction_generator)
-    tx_thread.daemon = True
-    tx_thread.start()
+    # Start batch flusher in a separate thread
+    flush_thread = threading.Thread(target=transaction_flusher)
+    flush_thread.daemon = True
+    flush_thread.start()
     
-    # Keep the main thread alive
+    # Keep the main thread alive (blocks without waking up until interrupted)
     try:
-        while True:
-            time.sleep(1)
+        threading.Event().wait()
     except KeyboardInterrupt:
-        print(f"[{datetime.now()}] Client shutting down")
+        logger.info("Client shutting down")
+        log_listener.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,60 +4,128 @@ Client for testing smart contracts in the blockchain system
 """
 
 import time
-import json
+import functools
+import orjson
 import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 import random
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import hashes, serialization
+from dataclasses import dataclass
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives import serialization
 
 # Constants
 NODE_ADDRESSES = []  # Will be populated with blockchain node addresses
 WAIT_TIME = 2  # Time to wait between operations
 
+# Endpoint URLs for each node, built on first use by build_node_urls()
+_URL_NODES = []  # NODE_ADDRESSES the URL lists below were built from
+_BALANCE_URLS = []
+_TX_URLS = []
+_DEPLOY_URLS = []
+_CALL_URLS = []
+_ACCOUNT_URLS = []
+
+# Shared HTTP session so requests to the nodes reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=0))
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+@dataclass
+class Account:
+    """
+    Simulated account with its key material and precomputed address
+    
+    Attributes:
+        private_key: Ed25519 private key
+        public_key_bytes: Raw 32-byte public key
+        address: SHA-256 hex digest of public_key_bytes
+    """
+    private_key: object
+    public_key_bytes: bytes
+    address: str
+
 def generate_keypair():
     """
-    Generate RSA keypair
+    Generate Ed25519 keypair
     
     Input: None
-    Output: (private_key, public_key, public_key_str)
+    Output: Account with the private key, public key bytes and address
     """
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048
-    )
+    private_key = ed25519.Ed25519PrivateKey.generate()
     public_key = private_key.public_key()
     
     # Get string representation of public key for addresses
     public_key_bytes = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
     )
     public_key_str = hashlib.sha256(public_key_bytes).hexdigest()
     
-    return private_key, public_key, public_key_str
+    return Account(private_key, public_key_bytes, public_key_str)
 
 def sign_message(private_key, message):
     """
     Sign a message with private key
     
     Input: 
-        private_key: RSA private key
+        private_key: Ed25519 private key
         message: String to sign
     Output: 
         signature: Hex string of the signature
     """
-    message_bytes = message.encode('utf-8')
-    signature = private_key.sign(
-        message_bytes,
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
+    return sign_bytes(private_key, message.encode('utf-8'))
+
+def sign_bytes(private_key, message_bytes):
+    """
+    Sign an already encoded message with private key
+    
+    Input: 
+        private_key: Ed25519 private key
+        message_bytes: UTF-8 encoded message to sign
+    Output: 
+        signature: Hex string of the signature
+    """
+    signature = private_key.sign(message_bytes)
     return signature.hex()  # Convert to hex string for easier handling
 
+@functools.lru_cache(maxsize=256)
+def _call_suffix(from_address, contract_id, function_name, args_json):
+    """
+    Encode the part of a contract call message that follows the timestamp
+    
+    Input:
+        from_address: Address of the caller
+        contract_id: ID of the contract to call
+        function_name: Name of the function to call
+        args_json: orjson-encoded arguments (bytes)
+    Output:
+        suffix: Bytes of ",from_address,contract_id,function_name,args_json"
+    """
+    return f",{from_address},{contract_id},{function_name},".encode('utf-8') + args_json
+
+def build_node_urls():
+    """
+    Preformat the endpoint URLs of every configured node, rebuilding them
+    only when NODE_ADDRESSES has changed since the last call
+    
+    Input: None
+    Output: None
+    """
+    if _URL_NODES == NODE_ADDRESSES:
+        return
+    
+    url_lists = (_BALANCE_URLS, _TX_URLS, _DEPLOY_URLS, _CALL_URLS, _ACCOUNT_URLS)
+    for urls in url_lists:
+        urls.clear()
+    _URL_NODES[:] = NODE_ADDRESSES
+    for node in NODE_ADDRESSES:
+        _BALANCE_URLS.append(f"http://{node}/balance/")
+        _TX_URLS.append(f"http://{node}/transactions/new")
+        _DEPLOY_URLS.append(f"http://{node}/contracts/deploy")
+        _CALL_URLS.append(f"http://{node}/contracts/call")
+        _ACCOUNT_URLS.append(f"http://{node}/accounts/create")
+
 def get_balance(account_address):
     """
     Get balance of an account
@@ -70,9 +138,9 @@ def get_balance(account_address):
     if not NODE_ADDRESSES:
         return 0
     
-    node_address = NODE_ADDRESSES[0]
+    build_node_urls()
     try:
-        response = requests.get(f"http://{node_address}/balance/{account_address}")
+        response = _SESSION.get(_BALANCE_URLS[0] + account_address)
         if response.status_code == 200:
             return response.json().get('balance', 0)
     except requests.exceptions.RequestException as e:
@@ -85,8 +153,8 @@ def send_funds(from_account, to_account, amount):
     Send funds from one account to another
     
     Input:
-        from_account: (private_key, public_key, public_key_str) of sender
-        to_account: (private_key, public_key, public_key_str) of receiver
+        from_account: Account of sender
+        to_account: Account of receiver
         amount: Amount to send
     Output:
         success: Boolean indicating success
@@ -94,16 +162,15 @@ def send_funds(from_account, to_account, amount):
     if not NODE_ADDRESSES:
         return False
     
-    node_address = NODE_ADDRESSES[0]
-    
+    build_node_urls()
     # Create message to sign
-    timestamp = time.time()
-    from_address = from_account[2]
-    to_address = to_account[2]
+    timestamp = time.time_ns()
+    from_address = from_account.address
+    to_address = to_account.address
     message = f"{timestamp},{from_address},{to_address},{amount}"
     
     # Sign the message
-    signature = sign_message(from_account[0], message)
+    signature = sign_message(from_account.private_key, message)
     
     # Create transaction
     transaction = {
@@ -116,7 +183,7 @@ def send_funds(from_account, to_account, amount):
     }
     
     try:
-        response = requests.post(f"http://{node_address}/transactions/new", json=transaction)
+        response = _SESSION.post(_TX_URLS[0], data=orjson.dumps(transaction), headers=_JSON_HEADERS)
         if response.status_code == 201:
             print(f"Transaction sent: {from_address[:8]}... -> {to_address[:8]}..., {amount} BTC")
             return True
@@ -132,7 +199,7 @@ def deploy_contract(account, contract_code):
     Deploy a smart contract
     
     Input:
-        account: (private_key, public_key, public_key_str) of contract deployer
+        account: Account of contract deployer
         contract_code: Code of the contract
     Output:
         contract_id: ID of the deployed contract, or None if failed
@@ -140,15 +207,14 @@ def deploy_contract(account, contract_code):
     if not NODE_ADDRESSES:
         return None
     
-    node_address = NODE_ADDRESSES[0]
-    
+    build_node_urls()
     # Create message to sign
-    timestamp = time.time()
-    from_address = account[2]
+    timestamp = time.time_ns()
+    from_address = account.address
     message = f"{timestamp},{from_address},{contract_code}"
     
     # Sign the message
-    signature = sign_message(account[0], message)
+    signature = sign_message(account.private_key, message)
     
     # Create deployment request
     deployment = {
@@ -158,7 +224,7 @@ def deploy_contract(account, contract_code):
     }
     
     try:
-        response = requests.post(f"http://{node_address}/contracts/deploy", json=deployment)
+        response = _SESSION.post(_DEPLOY_URLS[0], data=orjson.dumps(deployment), headers=_JSON_HEADERS)
         if response.status_code == 201:
             contract_id = response.json().get('contract_id')
             print(f"Contract deployed with ID: {contract_id}")
@@ -175,7 +241,7 @@ def call_contract(account, contract_id, function_name, args=None):
     Call a smart contract function
     
     Input:
-        account: (private_key, public_key, public_key_str) of caller
+        account: Account of caller
         contract_id: ID of the contract to call
         function_name: Name of the function to call
         args: Arguments for the function (dictionary)
@@ -185,15 +251,15 @@ def call_contract(account, contract_id, function_name, args=None):
     if not NODE_ADDRESSES:
         return None
     
-    node_address = NODE_ADDRESSES[0]
-    
+    build_node_urls()
     # Create message to sign
-    timestamp = time.time()
-    from_address = account[2]
-    message = f"{timestamp},{from_address},{contract_id},{function_name},{json.dumps(args or {})}"
+    timestamp = time.time_ns()
+    from_address = account.address
+    suffix = _call_suffix(from_address, contract_id, function_name, orjson.dumps(args or {}))
+    message_bytes = str(timestamp).encode('utf-8') + suffix
     
     # Sign the message
-    signature = sign_message(account[0], message)
+    signature = sign_bytes(account.private_key, message_bytes)
     
     # Create call request
     call = {
@@ -205,7 +271,7 @@ def call_contract(account, contract_id, function_name, args=None):
     }
     
     try:
-        response = requests.post(f"http://{node_address}/contracts/call", json=call)
+        response = _SESSION.post(_CALL_URLS[0], data=orjson.dumps(call), headers=_JSON_HEADERS)
         if response.status_code == 201:
             result = response.json().get('expected_result')
             print(f"Contract call submitted. Expected result: {result}")
@@ -225,7 +291,7 @@ def register_account(account, initial_balance=1000):
     Register an account with the blockchain node and give it an initial balance
     
     Input:
-        account: (private_key, public_key, public_key_str)
+        account: Account
         initial_balance: Initial balance to provide (default: 1000)
     Output:
         success: Boolean indicating success
@@ -233,8 +299,8 @@ def register_account(account, initial_balance=1000):
     if not NODE_ADDRESSES:
         return False
     
-    node_address = NODE_ADDRESSES[0]
-    account_address = account[2]
+    build_node_urls()
+    account_address = account.address
     
     # Create request to register account
     data = {
@@ -243,7 +309,7 @@ def register_account(account, initial_balance=1000):
     }
     
     try:
-        response = requests.post(f"http://{node_address}/accounts/create", json=data)
+        response = _SESSION.post(_ACCOUNT_URLS[0], data=orjson.dumps(data), headers=_JSON_HEADERS)
         if response.status_code == 201:
             print(f"Account registered: {account_address[:8]}... with balance {initial_balance}")
             return True
@@ -267,8 +333,8 @@ def test_transfer_contract():
     account1 = generate_keypair()
     account2 = generate_keypair()
     
-    print(f"Account 1: {account1[2][:8]}...")
-    print(f"Account 2: {account2[2][:8]}...")
+    print(f"Account 1: {account1.address[:8]}...")
+    print(f"Account 2: {account2.address[:8]}...")
     
     # Register accounts and give them initial balances
     print("Registering accounts with blockchain nodes...")
@@ -277,7 +343,7 @@ def test_transfer_contract():
     time.sleep(WAIT_TIME)
     
     # Get initial balance of account1
-    balance1 = get_balance(account1[2])
+    balance1 = get_balance(account1.address)
     print(f"Initial balance of Account 1: {balance1} BTC")
     
     # 修改后的转账合约代码
@@ -364,9 +430,9 @@ def test_auction_contract():
     bidder1 = generate_keypair()
     bidder2 = generate_keypair()
     
-    print(f"Seller: {seller[2][:8]}...")
-    print(f"Bidder 1: {bidder1[2][:8]}...")
-    print(f"Bidder 2: {bidder2[2][:8]}...")
+    print(f"Seller: {seller.address[:8]}...")
+    print(f"Bidder 1: {bidder1.address[:8]}...")
+    print(f"Bidder 2: {bidder2.address[:8]}...")
     
     # Register accounts and give them initial balances
     print("Registering accounts with blockchain nodes...")
@@ -508,7 +574,7 @@ def test_invalid_contract():
     
     # Generate account
     account = generate_keypair()
-    print(f"Account: {account[2][:8]}...")
+    print(f"Account: {account.address[:8]}...")
     
     # Register account and give it initial balance
     print("Registering account with blockchain nodes...")
@@ -589,6 +655,7 @@ def main():
         NODE_ADDRESSES.append("localhost:5000")
     
     print(f"Connected to nodes: {NODE_ADDRESSES}")
+    build_node_urls()
     
     # Configure wait time
     wait_time = os.environ.get('WAIT_TIME')
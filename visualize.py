@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 """
 区块链可视化脚本 - 用于创建区块链数据的可视化图表
-需要安装: pip install matplotlib requests
+需要安装: pip install matplotlib numpy requests
 """
 
 import requests
+import numpy as np
 import matplotlib.pyplot as plt
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 def get_blockchain_data(node_url):
@@ -36,15 +38,21 @@ def get_stats_data(node_url):
         print(f"Error connecting to node: {e}")
         return None
 
+def chain_arrays(blocks):
+    """将区块列表一次性转换为 NumPy 数组: (高度, 时间戳, 交易数量)"""
+    count = len(blocks)
+    heights = np.fromiter((block['height'] for block in blocks), dtype=np.int64, count=count)
+    timestamps = np.fromiter((block['timestamp'] for block in blocks), dtype=np.float64, count=count)
+    tx_counts = np.fromiter((len(block['transactions']) for block in blocks), dtype=np.int32, count=count)
+    return heights, timestamps, tx_counts
+
 def plot_blockchain_growth(chain_data):
     """绘制区块链增长图表"""
     if not chain_data or 'chain' not in chain_data:
         print("No valid chain data available")
         return
     
-    blocks = chain_data['chain']
-    heights = [block['height'] for block in blocks]
-    timestamps = [block['timestamp'] for block in blocks]
+    heights, timestamps, _ = chain_arrays(chain_data['chain'])
     
     # 将时间戳转换为可读格式
     times = [datetime.fromtimestamp(ts).strftime('%H:%M:%S') for ts in timestamps]
@@ -66,9 +74,7 @@ def plot_transaction_distribution(chain_data):
         print("No valid chain data available")
         return
     
-    blocks = chain_data['chain']
-    heights = [block['height'] for block in blocks]
-    tx_counts = [len(block['transactions']) for block in blocks]
+    heights, _, tx_counts = chain_arrays(chain_data['chain'])
     
     plt.figure(figsize=(12, 6))
     plt.bar(heights, tx_counts)
@@ -112,13 +118,11 @@ def plot_mining_time(chain_data):
         print("Not enough blocks for mining time analysis")
         return
     
-    # 计算相邻区块的时间差
-    mining_times = []
-    for i in range(1, len(blocks)):
-        time_diff = blocks[i]['timestamp'] - blocks[i-1]['timestamp']
-        mining_times.append(time_diff)
+    heights, timestamps, _ = chain_arrays(blocks)
     
-    block_heights = [blocks[i]['height'] for i in range(1, len(blocks))]
+    # 计算相邻区块的时间差
+    mining_times = np.diff(timestamps)
+    block_heights = heights[1:]
     
     plt.figure(figsize=(12, 6))
     plt.plot(block_heights, mining_times, marker='o', linestyle='-')
@@ -136,7 +140,12 @@ def main():
     node_url = input("请输入节点URL (默认: localhost:5001): ") or "localhost:5001"
     
     print(f"正在从 {node_url} 获取区块链数据...")
-    chain_data = get_blockchain_data(node_url)
+    # 同时请求区块链数据和统计数据
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        chain_future = executor.submit(get_blockchain_data, node_url)
+        stats_future = executor.submit(get_stats_data, node_url)
+        chain_data = chain_future.result()
+        stats_data = stats_future.result()
     
     if not chain_data:
         print("无法获取区块链数据。请确保节点正在运行。")
@@ -144,9 +153,6 @@ def main():
     
     print(f"已获取数据。区块链长度: {chain_data.get('length', 0)}")
     
-    # 获取统计数据
-    stats_data = get_stats_data(node_url)
-    
     # 创建所有图表
     plot_blockchain_growth(chain_data)
     plot_transaction_distribution(chain_data)